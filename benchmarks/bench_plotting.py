@@ -0,0 +1,156 @@
+""" Time to draw the summary figures for large metrics logs
+
+Compares the previous plotting path, which handed the raw metrics to seaborn
+for every figure, with aggregate_plot_data + render_figures, which summarise
+the data once and draw the figures (in parallel worker processes for large
+logs).
+
+The previous path's swarm plots grow super-linearly with the number of rows,
+so above --legacy-max-rows it is not run in full. Instead its time there is
+extrapolated from a power law fitted to full runs at --legacy-max-rows and a
+quarter of it, and reported next to a timed run without the swarm plots (box
+plots, scatter and pivot tables only), which is a lower bound on its cost.
+
+Usage: python -m benchmarks.bench_plotting [--rows 5000 10000 100000 1000000]
+
+"""
+# built-in
+import argparse
+import os
+import tempfile
+import time
+
+# analysis
+import numpy as np
+import pandas as pd
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+# local imports
+from reaction_time.plotting import aggregate_plot_data, render_figures  # noqa: E402
+
+KEY_LIST = [f"key_{i}" for i in range(10)]
+
+
+def simulate_metrics(n_rows, seed=0):
+    rng = np.random.RandomState(seed)
+    keys = rng.choice(KEY_LIST, size=n_rows + 1)
+    return pd.DataFrame(
+        {
+            "previous_key": keys[:-1],
+            "key": keys[1:],
+            "user_key": [key[-1] for key in keys[1:]],
+            "time_ms": rng.gamma(9, 50, size=n_rows),
+            "correct": rng.binomial(1, 0.9, size=n_rows),
+            "iters_last_selected": rng.geometric(0.1, size=n_rows) - 1,
+        }
+    )
+
+
+def legacy_figures(metrics_df, output_dir, swarm=True):
+    """ The figures drawn by print_results before pre-aggregation """
+    palette = {0: "#ff4500", 1: "#00ff00"}
+
+    fig, ax = plt.subplots(2, 1, sharex=True)
+    for axis, by in zip(ax, ["key", "previous_key"]):
+        sns.boxplot(data=metrics_df, x=by, y="time_ms", ax=axis)
+        if not swarm:
+            continue
+        sns.swarmplot(
+            data=metrics_df,
+            x=by,
+            y="time_ms",
+            hue="correct",
+            palette=palette,
+            alpha=0.5,
+            ax=axis,
+        )
+    fig.savefig(os.path.join(output_dir, "key_distributions.png"))
+    plt.close(fig)
+
+    fig, ax = plt.subplots()
+    sns.scatterplot(
+        data=metrics_df,
+        x="time_ms",
+        y="iters_last_selected",
+        hue="correct",
+        palette=palette,
+        alpha=0.5,
+        ax=ax,
+    )
+    fig.savefig(os.path.join(output_dir, "recency.png"))
+    plt.close(fig)
+
+    fig, ax = plt.subplots()
+    pivot = dict(data=metrics_df, index="previous_key", columns="key", values="time_ms")
+    transition_matrix = pd.pivot_table(**pivot, aggfunc="mean")
+    transition_count = pd.pivot_table(**pivot, aggfunc="count")
+    sns.heatmap(data=transition_matrix, annot=transition_count, cmap="coolwarm", ax=ax)
+    fig.savefig(os.path.join(output_dir, "transitions.png"))
+    plt.close(fig)
+
+
+def aggregated_figures(metrics_df, output_dir):
+    render_figures(aggregate_plot_data(metrics_df), output_dir)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def fit_power_law(full_times):
+    """ Fit time = scale * rows ** exponent through the two largest full runs """
+    (small_rows, small_time), (large_rows, large_time) = sorted(full_times.items())[-2:]
+    exponent = np.log(large_time / small_time) / np.log(large_rows / small_rows)
+    return lambda n_rows: large_time * (n_rows / large_rows) ** exponent, exponent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[5_000, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--legacy-max-rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+
+        def full_legacy(n_rows):
+            if n_rows not in full_times:
+                metrics_df = simulate_metrics(n_rows)
+                full_times[n_rows] = timed(legacy_figures, metrics_df, output_dir)
+            return full_times[n_rows]
+
+        full_times = {}
+        if any(n_rows > args.legacy_max_rows for n_rows in args.rows):
+            for n_rows in (args.legacy_max_rows // 4, args.legacy_max_rows):
+                full_legacy(n_rows)
+            extrapolate, exponent = fit_power_law(full_times)
+            print(f"full legacy time ~ rows ** {exponent:.2f}")
+
+        for n_rows in args.rows:
+            metrics_df = simulate_metrics(n_rows)
+
+            aggregate_time = timed(aggregate_plot_data, metrics_df)
+            total_time = timed(aggregated_figures, metrics_df, output_dir)
+            no_swarm = timed(legacy_figures, metrics_df, output_dir, False)
+            if n_rows <= args.legacy_max_rows:
+                legacy = f"{full_legacy(n_rows):.2f}s"
+            else:
+                legacy = f"~{extrapolate(n_rows):.0f}s (extrapolated)"
+
+            print(
+                f"rows={n_rows:>9d} legacy={legacy:>22s} "
+                f"legacy without swarm (lower bound)={no_swarm:6.2f}s "
+                f"aggregated={total_time:6.2f}s "
+                f"(of which aggregation {aggregate_time:5.2f}s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
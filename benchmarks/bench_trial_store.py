@@ -0,0 +1,97 @@
+""" Memory used by an hour-long session's trial history
+
+Compares the old list-of-tuples history, which grew by one row per rendered
+frame (60 rows/sec) once the first key was pressed, with TrialStore, which
+only stores real trials.
+
+Usage: python -m benchmarks.bench_trial_store
+
+"""
+# built-in
+import time
+import tracemalloc
+
+# analysis
+import numpy as np
+
+# local imports
+from reaction_time.trial_store import TrialStore
+
+SESSION_SECONDS = 60 * 60
+FPS = 60
+TRIALS_PER_SECOND = 2
+KEY_LIST = [f"key_{i}" for i in range(10)]
+
+
+def simulate_trials(n_trials, seed=0):
+    rng = np.random.RandomState(seed)
+    keys = rng.choice(KEY_LIST, size=n_trials)
+    times = rng.uniform(150, 900, size=n_trials)
+    correct = rng.randint(0, 2, size=n_trials)
+    iters = rng.randint(0, 30, size=n_trials)
+    return [
+        (
+            keys[i - 1] if i else None,
+            keys[i],
+            keys[i][-1],
+            times[i],
+            correct[i],
+            iters[i],
+        )
+        for i in range(n_trials)
+    ]
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def tuple_history(trials, rows_per_trial):
+    history = list()
+    for previous_key, key, user_key, time_ms, correct, iters in trials:
+        history.append(
+            (previous_key, key, user_key, float(time_ms), int(correct), int(iters))
+        )
+        for _ in range(rows_per_trial - 1):
+            history.append((previous_key, key, None, None, None, int(iters)))
+    return history
+
+
+def trial_store(trials):
+    store = TrialStore(KEY_LIST)
+    for trial, (previous_key, key, user_key, time_ms, correct, iters) in enumerate(
+        trials
+    ):
+        store.append(trial, previous_key, key, user_key, time_ms, correct, iters)
+    return store
+
+
+def main():
+    n_trials = SESSION_SECONDS * TRIALS_PER_SECOND
+    trials = simulate_trials(n_trials)
+
+    per_frame = FPS // TRIALS_PER_SECOND
+    results = [
+        ("list of tuples, row per frame", lambda: tuple_history(trials, per_frame)),
+        ("list of tuples, row per trial", lambda: tuple_history(trials, 1)),
+        ("TrialStore", lambda: trial_store(trials)),
+        ("TrialStore.to_dataframe", trial_store(trials).to_dataframe),
+    ]
+
+    print(f"{n_trials} trials, {SESSION_SECONDS}s at {TRIALS_PER_SECOND} trials/s")
+    for name, build in results:
+        history, nbytes, elapsed = measure(build)
+        print(
+            f"{name:32s} rows={len(history):8d} "
+            f"memory={nbytes / 1e6:8.2f}MB time={elapsed:6.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,70 @@
+import sys
+import argparse
+
+from reaction_time.config import load_session_plan, parse_overrides
+from reaction_time.replay import replay_sessions
 from reaction_time.reaction_time import ReactionTime
 from reaction_time.reaction_time_gui import ReactionTimeGUI
 
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Reaction Time Experiment")
+    parser.add_argument(
+        "--config", help="Path to the configuration file (default: ./config.cfg)"
+    )
+    parser.add_argument("--profile", help="Named profile within the configuration")
+    parser.add_argument(
+        "--set",
+        action="append",
+        metavar="SECTION.OPTION=VALUE",
+        help="Override a configuration value, may be repeated",
+    )
+    parser.add_argument(
+        "--figures-dir",
+        help="Save the figures here (drawn in parallel) instead of showing them",
+    )
+    parser.add_argument(
+        "--replay",
+        nargs="+",
+        metavar="EVENT_LOG",
+        help="Re-score saved *_events.csv logs under the current configuration",
+    )
+    parser.add_argument(
+        "--terminal", action="store_true", help="Run the terminal (non-GUI) version"
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == '__main__':
-    reaction = ReactionTimeGUI()
+    args = parse_args()
+
+    config_path = args.config
+    if config_path is None and sys.stdin.isatty():
+        print(
+            "Please provide the file path to your configuration file"
+            " (blank for default: ./config.cfg):\n"
+        )
+        config_path = input()
+    config_path = config_path or "config.cfg"
+
+    overrides = parse_overrides(args.set)
+    if args.figures_dir is not None:
+        overrides[("MODE", "FIGURES_DIR")] = args.figures_dir
+
+    plan = load_session_plan(config_path, profile=args.profile, overrides=overrides)
+
+    if args.replay:
+        replay_path = f"logs/{plan.log_name}_replay.csv"
+        replay_sessions(args.replay, plan).to_csv(replay_path, index=False)
+        print(f"Saved {replay_path}")
+        sys.exit()
+
+    reaction_class = ReactionTime if args.terminal else ReactionTimeGUI
+    reaction = reaction_class(plan=plan)
 
-    if reaction.plot_mode == "True":
-        reaction.print_results(f'logs/{reaction.log_name}.csv')
+    if reaction.plot_mode:
+        reaction.print_results(
+            f'logs/{reaction.log_name}.csv', output_dir=reaction.figures_dir
+        )
     else:
         reaction.run()
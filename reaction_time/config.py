@@ -0,0 +1,378 @@
+# built-in
+import os
+import hashlib
+import pickle
+import tempfile
+import configparser
+from dataclasses import dataclass, field
+
+# analysis
+import numpy as np
+
+# bump whenever SessionPlan changes so stale cached plans are ignored
+PLAN_VERSION = 4
+ENV_PREFIX = "REACTION_TIME_"
+DEFAULT_CACHE_DIR = ".plan_cache"
+
+# (section, option) -> type for every scalar setting, with None marking required
+CONFIG_SCHEMA = {
+    ("GENERAL", "LOW_SPEED"): (float, None),
+    ("GENERAL", "HIGH_SPEED"): (float, None),
+    ("GENERAL", "SEQUENCE_LENGTH"): (int, None),
+    ("MODE", "LOG_NAME"): (str, None),
+    ("MODE", "PLOT_MODE"): (bool, False),
+    ("MODE", "CALIBRATION_MS"): (float, 0.0),
+    ("MODE", "PROFILE_FRAMES"): (bool, False),
+    ("MODE", "PROFILE_OVERLAY"): (bool, False),
+    ("MODE", "FIGURES_DIR"): (str, ""),
+}
+KEY_SECTIONS = ("KEY_MAPPING", "KEY_SCORES")
+
+
+class ConfigError(ValueError):
+    """ Raised when a configuration file is missing or invalid """
+
+
+@dataclass(frozen=True)
+class SessionPlan:
+    """ Immutable, compiled form of a configuration file
+
+    Attributes
+    ----------
+    key_list : tuple
+        Key names in config order, a key's position is its id
+    key_mapping : tuple
+        (key name, button) pairs from KEY_MAPPING
+    key_probabilities : np.ndarray
+        Selection probability per key id (normalised KEY_SCORES)
+    alias_probabilities, alias_indices : np.ndarray
+        Walker alias table for O(1) key sampling
+    low_speed, high_speed : float
+        Bounds (seconds) of the uniform wait between iterations
+    sequence_length : int
+        Number of characters read per key press in terminal mode
+    log_name : str
+        Name of the csv written to logs/
+    plot_mode : bool
+        Plot an existing log instead of running a session
+    calibration_ms : float
+        Input latency subtracted by replay_events / replay_sessions
+    profile_frames, profile_overlay : bool
+        Enable the GUI frame profiler and its on-screen overlay
+    figures_dir : str or None
+        Save the summary figures here (drawn in parallel) instead of showing them
+
+    """
+
+    key_list: tuple
+    key_mapping: tuple
+    key_probabilities: np.ndarray = field(compare=False)
+    alias_probabilities: np.ndarray = field(compare=False)
+    alias_indices: np.ndarray = field(compare=False)
+    low_speed: float
+    high_speed: float
+    sequence_length: int
+    log_name: str
+    plot_mode: bool
+    calibration_ms: float
+    profile_frames: bool
+    profile_overlay: bool
+    figures_dir: str
+
+    def __post_init__(self):
+        self._freeze_arrays()
+
+    def __setstate__(self, state):
+        # unpickling bypasses __post_init__, so freeze the arrays here too
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        self._freeze_arrays()
+
+    def _freeze_arrays(self):
+        for array in (
+            self.key_probabilities,
+            self.alias_probabilities,
+            self.alias_indices,
+        ):
+            array.flags.writeable = False
+
+    @property
+    def key_dict(self):
+        return dict(self.key_mapping)
+
+    @property
+    def key_ids(self):
+        return {key: i for i, key in enumerate(self.key_list)}
+
+    def sample_key(self):
+        """ Draw a key name with probability key_probabilities (alias method) """
+        i = np.random.randint(len(self.key_list))
+        if np.random.random_sample() >= self.alias_probabilities[i]:
+            i = self.alias_indices[i]
+        return self.key_list[i]
+
+    def speed(self):
+        """ Draw the wait (seconds) before the next iteration """
+        return np.random.uniform(self.low_speed, self.high_speed)
+
+
+def build_alias_table(probabilities):
+    """ Build a Walker/Vose alias table for sampling a discrete distribution
+
+    Parameters
+    ----------
+    probabilities : np.ndarray
+        Probabilities summing to 1
+
+    Returns
+    -------
+    tuple of np.ndarray
+        (acceptance probability, alias index) per bucket
+
+    """
+    n = len(probabilities)
+    scaled = np.asarray(probabilities, dtype=np.float64) * n
+    alias_probabilities = np.ones(n)
+    alias_indices = np.arange(n)
+
+    small = [i for i in range(n) if scaled[i] < 1]
+    large = [i for i in range(n) if scaled[i] >= 1]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        alias_probabilities[less] = scaled[less]
+        alias_indices[less] = more
+        scaled[more] += scaled[less] - 1
+        (small if scaled[more] < 1 else large).append(more)
+
+    return alias_probabilities, alias_indices
+
+
+def parse_overrides(assignments):
+    """ Parse "SECTION.OPTION=VALUE" strings (e.g. from --set) into a dict
+
+    Parameters
+    ----------
+    assignments : list
+        Strings such as "GENERAL.LOW_SPEED=0.1"
+
+    Returns
+    -------
+    dict
+        (section, option) -> value
+
+    """
+    overrides = {}
+    for assignment in assignments or []:
+        target, sep, value = assignment.partition("=")
+        section, dot, option = target.partition(".")
+        if not sep or not dot:
+            raise ConfigError(
+                f"Invalid override '{assignment}', expected SECTION.OPTION=VALUE"
+            )
+        overrides[(section.strip(), option.strip())] = value.strip()
+    return overrides
+
+
+def env_overrides(environ=None):
+    """ Collect REACTION_TIME_<SECTION>__<OPTION>=VALUE environment overrides """
+    if environ is None:
+        environ = os.environ
+
+    overrides = {}
+    for name, value in environ.items():
+        if name.startswith(ENV_PREFIX) and "__" in name:
+            section, option = name[len(ENV_PREFIX) :].split("__", 1)
+            overrides[(section, option)] = value
+    return overrides
+
+
+def load_session_plan(
+    config_path="config.cfg", profile=None, overrides=None, cache_dir=DEFAULT_CACHE_DIR
+):
+    """ Load, validate and compile a configuration file into a SessionPlan
+
+    Settings are resolved in increasing priority:
+        1. sections of the config file, e.g. [GENERAL]
+        2. sections of the named profile, e.g. [GENERAL:fast] for profile="fast"
+           ([KEY_MAPPING:fast] / [KEY_SCORES:fast] replace the whole section)
+        3. REACTION_TIME_<SECTION>__<OPTION> environment variables
+        4. overrides (e.g. parsed from --set on the command line)
+
+    Compiled plans are pickled into cache_dir keyed by a hash of all of the
+    above, so repeated starts with the same inputs skip parsing entirely.
+
+    Parameters
+    ----------
+    config_path : str
+        Path to the configuration file
+    profile : str, optional
+        Name of the profile to apply
+    overrides : dict, optional
+        (section, option) -> value, applied last
+    cache_dir : str or None, optional
+        Directory for cached plans, None disables caching
+
+    Returns
+    -------
+    SessionPlan
+
+    """
+    if not os.path.isfile(config_path):
+        raise ConfigError(f"Config file not found at {config_path}")
+
+    with open(config_path, "rb") as f:
+        raw_config = f.read()
+
+    overrides = {**env_overrides(), **(overrides or {})}
+    _validate_overrides(overrides)
+
+    digest = hashlib.sha256(raw_config)
+    digest.update(repr((PLAN_VERSION, profile, sorted(overrides.items()))).encode())
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = os.path.join(cache_dir, f"{digest.hexdigest()}.pkl")
+        try:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            # a missing, stale or unreadable cache entry is rebuilt below
+            pass
+
+    config = configparser.ConfigParser()
+    try:
+        config.read_string(raw_config.decode("utf-8"), source=config_path)
+    except configparser.Error as e:
+        raise ConfigError(f"Could not parse {config_path}: {e}") from e
+
+    _apply_profile(config, profile)
+    for (section, option), value in overrides.items():
+        if not config.has_section(section):
+            config.add_section(section)
+        config.set(section, option, str(value))
+
+    plan = compile_session_plan(config)
+
+    if cache_path is not None:
+        _write_cache(plan, cache_dir, cache_path)
+
+    return plan
+
+
+def compile_session_plan(config):
+    """ Validate a parsed ConfigParser and compile it into a SessionPlan
+
+    Parameters
+    ----------
+    config : configparser.ConfigParser
+
+    Returns
+    -------
+    SessionPlan
+
+    """
+    for section in KEY_SECTIONS:
+        if not config.has_section(section) or not config.options(section):
+            raise ConfigError(f"Config section [{section}] is missing or empty")
+
+    key_mapping = tuple(config.items("KEY_MAPPING"))
+    key_scores = config.items("KEY_SCORES")
+    key_list = tuple(key for key, _ in key_scores)
+
+    if tuple(key for key, _ in key_mapping) != key_list:
+        raise ConfigError("KEY_MAPPING and KEY_SCORES don't have the same keys")
+    if len(key_list) > 256:
+        raise ConfigError("At most 256 keys are supported")
+
+    scores = np.array([_convert("KEY_SCORES", key, v, float) for key, v in key_scores])
+    if (scores < 0).any() or scores.sum() <= 0:
+        raise ConfigError("KEY_SCORES must be non-negative with a positive total")
+    key_probabilities = scores / scores.sum()
+    alias_probabilities, alias_indices = build_alias_table(key_probabilities)
+
+    settings = {}
+    for (section, option), (kind, default) in CONFIG_SCHEMA.items():
+        if config.has_option(section, option):
+            value = config.get(section, option)
+            settings[option.lower()] = _convert(section, option, value, kind)
+        elif default is not None:
+            settings[option.lower()] = default
+        else:
+            raise ConfigError(f"Missing required setting {section}.{option}")
+
+    if not 0 <= settings["low_speed"] <= settings["high_speed"]:
+        raise ConfigError("Expected 0 <= LOW_SPEED <= HIGH_SPEED")
+    if settings["sequence_length"] < 1:
+        raise ConfigError("SEQUENCE_LENGTH must be at least 1")
+
+    return SessionPlan(
+        key_list=key_list,
+        key_mapping=key_mapping,
+        key_probabilities=key_probabilities,
+        alias_probabilities=alias_probabilities,
+        alias_indices=alias_indices,
+        low_speed=settings["low_speed"],
+        high_speed=settings["high_speed"],
+        sequence_length=settings["sequence_length"],
+        log_name=settings["log_name"],
+        plot_mode=settings["plot_mode"],
+        calibration_ms=settings["calibration_ms"],
+        profile_frames=settings["profile_frames"],
+        profile_overlay=settings["profile_overlay"],
+        figures_dir=settings["figures_dir"] or None,
+    )
+
+
+def _validate_overrides(overrides):
+    known_options = {(section, option) for section, option in CONFIG_SCHEMA}
+    for section, option in overrides:
+        if section in KEY_SECTIONS:
+            continue
+        if (section, option.upper()) not in known_options:
+            raise ConfigError(f"Unknown setting {section}.{option} in overrides")
+
+
+def _write_cache(plan, cache_dir, cache_path):
+    # write to a temporary file and rename so concurrent starts never read a
+    # partially written plan, caching is best effort so failures are ignored
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=cache_dir, suffix=".tmp", delete=False
+        ) as f:
+            pickle.dump(plan, f)
+        os.replace(f.name, cache_path)
+    except OSError:
+        pass
+
+
+def _apply_profile(config, profile):
+    if profile is None:
+        return
+
+    profile_sections = [
+        section
+        for section in config.sections()
+        if section.rpartition(":")[2] == profile and ":" in section
+    ]
+    if not profile_sections:
+        raise ConfigError(f"Profile '{profile}' not found in config")
+
+    for profile_section in profile_sections:
+        section = profile_section.rpartition(":")[0]
+        if section in KEY_SECTIONS and config.has_section(section):
+            config.remove_section(section)
+        if not config.has_section(section):
+            config.add_section(section)
+        for option, value in config.items(profile_section):
+            config.set(section, option, value)
+
+
+def _convert(section, option, value, kind):
+    try:
+        if kind is bool:
+            return configparser.ConfigParser.BOOLEAN_STATES[value.lower()]
+        return kind(value)
+    except (KeyError, ValueError):
+        raise ConfigError(
+            f"Invalid value '{value}' for {section}.{option}, expected {kind.__name__}"
+        )
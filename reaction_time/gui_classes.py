@@ -52,7 +52,7 @@ class GameConfig:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.run = False
-                return None, None, None
+                return None, None, None, None
 
             if event.type == pygame.KEYDOWN:
                 if self.start_time:
@@ -62,10 +62,8 @@ class GameConfig:
                     time_elapsed = None
 
                 mouse_position = pygame.mouse.get_pos()
-                if (
-                    circle.check_hitbox(mouse_position)
-                    and event.unicode == selected_key
-                ):
+                hit = int(circle.check_hitbox(mouse_position))
+                if hit and event.unicode == selected_key:
                     self.score += 1
                     correct_flag = 1
                     circle.color = (0, 255, 0)
@@ -77,9 +75,9 @@ class GameConfig:
                 self.print_score()
                 circle.fade = True
                 self.start_time = pygame.time.get_ticks()
-                return time_elapsed, event.unicode, correct_flag
+                return time_elapsed, event.unicode, correct_flag, hit
 
-        return None, None, None
+        return None, None, None, None
 
     def quit(self):
         pygame.quit()
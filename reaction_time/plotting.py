@@ -0,0 +1,303 @@
+# built-in
+import os
+from multiprocessing import Pool
+
+# analysis
+import numpy as np
+import pandas as pd
+import matplotlib
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+PALETTE = {0: "#ff4500", 1: "#00ff00"}
+
+# below this many metrics rows, starting worker processes costs more than it saves
+PARALLEL_MIN_ROWS = 100_000
+
+
+def aggregate_plot_data(metrics_df, bins=50, sample_size=100, seed=0):
+    """ Reduce a metrics DataFrame to the compact summaries needed for plotting
+
+    The raw data is scanned once per summary, after which every figure and
+    printed table can be produced without touching it again, regardless of
+    how many rows it had.
+
+    Parameters
+    ----------
+    metrics_df: pd.DataFrame
+        Output metrics from ReactionTime.run()
+    bins: int, optional
+        Number of time_ms bins for the time vs recency histogram
+    sample_size: int, optional
+        Points kept per (key, correct) group for the strip overlays
+    seed: int, optional
+        Seed for the strip overlay sample
+
+    Returns
+    -------
+    dict
+        Picklable summaries consumed by print_results and the draw_* functions
+
+    """
+    timed = metrics_df.dropna(subset=["time_ms"])
+    if timed.empty:
+        raise ValueError("Not enough sample data to generate metrics.")
+
+    # sum and count per transition in one pass, keeping rows without a previous
+    # key so the per key rollup still includes them
+    totals = metrics_df.groupby(["previous_key", "key"], observed=True, dropna=False)
+    totals = totals[["time_ms", "correct"]].agg(["sum", "count"])
+    transitions = totals[totals.index.get_level_values("previous_key").notna()]
+    timed_transitions = transitions[transitions[("time_ms", "count")] > 0]
+
+    # binned time vs iterations since last selected, per correctness
+    recency = timed.dropna(subset=["iters_last_selected", "correct"])
+    time_edges = np.histogram_bin_edges(recency["time_ms"], bins=bins)
+    max_iters = int(recency["iters_last_selected"].max()) if len(recency) else 0
+    iters_edges = np.arange(max_iters + 2) - 0.5
+    recency_hist = {
+        flag: np.histogram2d(
+            group["time_ms"],
+            group["iters_last_selected"],
+            bins=(time_edges, iters_edges),
+        )[0]
+        for flag, group in recency.groupby("correct")
+    }
+
+    return {
+        "n_rows": len(metrics_df),
+        "key_performance": _mean_performance(totals, "key"),
+        "previous_key_performance": _mean_performance(transitions, "previous_key"),
+        "transition_performance": _mean_performance(
+            transitions, ["previous_key", "key"]
+        ),
+        "key": _distribution_summary(timed, "key", sample_size, seed),
+        "previous_key": _distribution_summary(timed, "previous_key", sample_size, seed),
+        "transition_mean": _means(timed_transitions)["time_ms"].unstack(),
+        "transition_count": timed_transitions[("time_ms", "count")].unstack(),
+        "recency_hist": recency_hist,
+        "time_edges": time_edges,
+        "iters_edges": iters_edges,
+    }
+
+
+def draw_key_distributions(plot_data):
+    """ Box plots (with a sampled strip overlay) of time for key and previous key """
+    fig, ax = plt.subplots(2, 1, sharex=True)
+    titles = {
+        "key": "Time (ms) Distribution for Key",
+        "previous_key": "Time (ms) Distribution Given Previous Key",
+    }
+
+    for axis, (by, title) in zip(ax, titles.items()):
+        stats, sample = plot_data[by]
+        order = [box["label"] for box in stats]
+        axis.bxp(stats, positions=range(len(stats)), showfliers=False)
+        if len(sample):
+            sns.stripplot(
+                data=sample,
+                x=by,
+                y="time_ms",
+                hue="correct",
+                palette=PALETTE,
+                order=order,
+                alpha=0.5,
+                size=3,
+                ax=axis,
+            )
+        axis.set_xlim(-0.5, len(stats) - 0.5)
+        axis.title.set_text(title)
+        axis.set_xlabel("")
+
+        # Set the formatting the same for both subplots
+        axis.tick_params(axis="both", which="both", labelsize=7, labelbottom=True)
+
+    fig.tight_layout()
+    return fig
+
+
+def draw_recency(plot_data):
+    """ Time taken vs iterations since last selected, drawn from 2-D bin counts """
+    fig, ax = plt.subplots()
+    time_edges, iters_edges = plot_data["time_edges"], plot_data["iters_edges"]
+    time_centres = (time_edges[:-1] + time_edges[1:]) / 2
+    iters_centres = (iters_edges[:-1] + iters_edges[1:]) / 2
+
+    for flag, counts in plot_data["recency_hist"].items():
+        time_i, iters_i = np.nonzero(counts)
+        sizes = counts[time_i, iters_i]
+        ax.scatter(
+            time_centres[time_i],
+            iters_centres[iters_i],
+            s=10 + 90 * sizes / sizes.max(),
+            color=PALETTE[int(flag)],
+            alpha=0.5,
+            label=str(int(flag)),
+        )
+
+    ax.set_xlabel("time_ms")
+    ax.set_ylabel("iters_last_selected")
+    ax.legend(title="correct")
+    ax.set_title("Time Taken vs Iterations Since Last Selected")
+    return fig
+
+
+def draw_transitions(plot_data):
+    """ Heatmap of average time per transition, annotated with counts """
+    fig, ax = plt.subplots()
+    sns.heatmap(
+        data=plot_data["transition_mean"],
+        annot=plot_data["transition_count"],
+        cmap="coolwarm",
+        ax=ax,
+    )
+    ax.set_title("Transition Matrix (Color - Avg Time Taken (ms), Annotation - Count)")
+    return fig
+
+
+FIGURES = {
+    "key_distributions": draw_key_distributions,
+    "recency": draw_recency,
+    "transitions": draw_transitions,
+}
+
+
+def render_figures(plot_data, output_dir, processes=None):
+    """ Draw every figure and save them as png, in parallel for large logs
+
+    Parameters
+    ----------
+    plot_data: dict
+        Output of aggregate_plot_data
+    output_dir: str
+        Directory the figures are written to
+    processes: int, optional
+        Number of worker processes (default: one per figure when the data has
+        at least PARALLEL_MIN_ROWS rows, otherwise draw in this process)
+
+    Returns
+    -------
+    list
+        Paths of the saved figures
+
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [
+        (name, plot_data, os.path.join(output_dir, f"{name}.png")) for name in FIGURES
+    ]
+
+    if processes is None:
+        processes = len(jobs) if plot_data["n_rows"] >= PARALLEL_MIN_ROWS else 1
+    if processes == 1:
+        return [_render_figure(job) for job in jobs]
+
+    with Pool(processes, initializer=matplotlib.use, initargs=("Agg",)) as pool:
+        return pool.map(_render_figure, jobs)
+
+
+def print_results(metrics_df, output_dir=None, processes=None):
+    """ Print average statistics and create plots to summarize the run
+
+    Parameters
+    ----------
+    metrics_df: pd.DataFrame or str
+        Output metrics from ReactionTime.run()
+    output_dir: str, optional
+        Save the figures here (drawn in parallel for large logs) instead of
+        showing them
+    processes: int, optional
+        Number of worker processes used when output_dir is given
+
+    Returns
+    -------
+    None
+
+    """
+
+    # if string passed, read in dataframe
+    if isinstance(metrics_df, str):
+        metrics_df = pd.read_csv(metrics_df)
+
+    plot_data = aggregate_plot_data(metrics_df)
+
+    # print out some summary statistics
+    print(f"Average time for key\n: {plot_data['key_performance']}")
+    print(
+        f"Average time given previous key\n: {plot_data['previous_key_performance']}"
+    )
+    print(f"Average time given transition\n: {plot_data['transition_performance']}")
+
+    if output_dir is not None:
+        for path in render_figures(plot_data, output_dir, processes):
+            print(f"Saved {path}")
+        return
+
+    for draw in FIGURES.values():
+        draw(plot_data)
+        plt.show()
+
+
+def _render_figure(job):
+    name, plot_data, path = job
+    fig = FIGURES[name](plot_data)
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def _means(totals):
+    # per metric mean from the ("metric", "sum") / ("metric", "count") columns
+    sums = totals.xs("sum", axis=1, level=1)
+    counts = totals.xs("count", axis=1, level=1)
+    return sums / counts.where(counts > 0)
+
+
+def _mean_performance(totals, by):
+    # same table as avg_time_scores_by, rolled up from the transition totals
+    return (
+        _means(totals.groupby(level=by, observed=True).sum())
+        .sort_values("time_ms", ascending=False)
+        .reset_index()
+    )
+
+
+def _distribution_summary(timed, by, sample_size, seed):
+    if timed[by].isna().all():
+        raise ValueError("Not enough sample data to generate metrics.")
+
+    # box plot statistics in the format expected by Axes.bxp
+    grouped = timed.groupby(by, observed=True)["time_ms"]
+    quantiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    means = grouped.mean()
+
+    # whiskers reach the furthest points within 1.5 IQR of the box
+    iqr = quantiles[0.75] - quantiles[0.25]
+    limits = pd.DataFrame(
+        {"low": quantiles[0.25] - 1.5 * iqr, "high": quantiles[0.75] + 1.5 * iqr}
+    )
+    bounds = timed[[by, "time_ms"]].join(limits, on=by)
+    inside = bounds[bounds["time_ms"].between(bounds["low"], bounds["high"])]
+    whislo = inside.groupby(by, observed=True)["time_ms"].min()
+    whishi = inside.groupby(by, observed=True)["time_ms"].max()
+
+    stats = [
+        {
+            "label": str(key),
+            "q1": quantiles.at[key, 0.25],
+            "med": quantiles.at[key, 0.5],
+            "q3": quantiles.at[key, 0.75],
+            "mean": means[key],
+            "whislo": whislo[key],
+            "whishi": whishi[key],
+            "fliers": [],
+        }
+        for key in quantiles.index
+    ]
+
+    # a bounded sample per (key, correct) group for the strip overlay
+    shuffled = timed[[by, "time_ms", "correct"]].dropna(subset=[by, "correct"])
+    shuffled = shuffled.sample(frac=1, random_state=seed)
+    position = shuffled.groupby([by, "correct"], observed=True).cumcount()
+    sample = shuffled[position < sample_size].astype({by: str, "correct": int})
+
+    return stats, sample
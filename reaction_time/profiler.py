@@ -0,0 +1,224 @@
+# built-in
+import json
+import os
+import time
+
+# analysis
+import numpy as np
+
+# non-standard library
+import pygame
+
+
+class FrameProfiler:
+    """ Low overhead per-frame timer for the GUI loop
+
+    Each frame is split into phases which are timed with consecutive calls to
+    `lap`. Durations are written into preallocated numpy arrays (grown by
+    doubling if a session outlasts them) so that timing a phase never
+    allocates a python object per frame.
+
+    """
+
+    PHASES = (
+        "event_handler",
+        "bookkeeping",
+        "fill_background",
+        "render_circles",
+        "print_score",
+        "overlay",
+        "display_update",
+        "clock_tick",
+    )
+    OVERLAY_FONT_SIZE = 14
+    EXPORT_CHUNK_FRAMES = 10000
+
+    def __init__(self, enabled=True, overlay=False, capacity=60 * 60 * 10, window=60):
+        """ Initialize the FrameProfiler Object
+
+        Parameters
+        ----------
+        enabled : bool
+            If False, every method returns immediately
+        overlay : bool
+            Draw the rolling phase averages on screen
+        capacity : int
+            Number of frames to preallocate (default: 10 minutes at 60fps),
+            nothing is allocated when the profiler is disabled
+        window : int
+            Number of frames averaged by the on-screen overlay
+
+        """
+        self.enabled = enabled
+        self.overlay = overlay and enabled
+        self.window = window
+        self.phase_index = {phase: i for i, phase in enumerate(self.PHASES)}
+        self._font = None
+
+        if not enabled:
+            capacity = 0
+
+        self.n_frames = 0
+        self.frame_starts = np.zeros(capacity, dtype=np.float64)
+        self.frame_trials = np.zeros(capacity, dtype=np.int64)
+        self.durations = np.zeros((capacity, len(self.PHASES)), dtype=np.float64)
+
+        self._origin = time.perf_counter()
+        self._mark = self._origin
+
+    def start_frame(self, trial):
+        """ Begin timing a new frame
+
+        Parameters
+        ----------
+        trial : int
+            Trial number (game.n_iter) the frame belongs to
+
+        Returns
+        -------
+        None
+
+        """
+        if not self.enabled:
+            return
+
+        if self.n_frames == len(self.frame_starts):
+            self._grow()
+
+        self._mark = time.perf_counter()
+        self.frame_starts[self.n_frames] = self._mark - self._origin
+        self.frame_trials[self.n_frames] = trial
+        self.durations[self.n_frames] = 0
+        self.n_frames += 1
+
+    def lap(self, phase):
+        """ Record the time elapsed since the previous lap against a phase
+
+        Parameters
+        ----------
+        phase : str
+            One of FrameProfiler.PHASES
+
+        Returns
+        -------
+        None
+
+        """
+        if not self.enabled:
+            return
+
+        now = time.perf_counter()
+        self.durations[self.n_frames - 1, self.phase_index[phase]] += now - self._mark
+        self._mark = now
+
+    def render_overlay(self, game):
+        """ Draw the rolling average of each phase (ms), one line per phase
+
+        Parameters
+        ----------
+        game : GameConfig
+            Game whose display is drawn on
+
+        Returns
+        -------
+        None
+
+        """
+        if not self.overlay or self.n_frames < 2:
+            return
+
+        # the current frame is still being timed, so average completed ones only
+        completed = self.n_frames - 1
+        recent = self.durations[max(0, completed - self.window) : completed]
+        averages = recent.mean(axis=0) * 1000
+
+        if self._font is None:
+            self._font = pygame.font.SysFont("Comic Sans MS", self.OVERLAY_FONT_SIZE)
+
+        line_height = self._font.get_linesize()
+        top = game.display_height - line_height * len(self.PHASES)
+        for i, (phase, avg) in enumerate(zip(self.PHASES, averages)):
+            label = self._font.render(f"{phase}: {avg:0.2f}ms", 1, (0, 0, 0))
+            game.display.blit(label, (4, top + i * line_height))
+
+    def summary(self):
+        """ Summarize the recorded phase durations in milliseconds
+
+        Returns
+        -------
+        dict
+            phase -> {"mean", "p95", "max", "total"} in milliseconds
+
+        """
+        durations = self.durations[: self.n_frames] * 1000
+        if self.n_frames == 0:
+            return {}
+
+        return {
+            phase: {
+                "mean": float(durations[:, i].mean()),
+                "p95": float(np.percentile(durations[:, i], 95)),
+                "max": float(durations[:, i].max()),
+                "total": float(durations[:, i].sum()),
+            }
+            for i, phase in enumerate(self.PHASES)
+        }
+
+    def export_chrome_trace(self, path):
+        """ Save the recorded frames as a Chrome trace (chrome://tracing, Perfetto)
+
+        Every phase becomes a complete ("X") event tagged with its frame and
+        trial number (game.n_iter), the same value written to the "trial" column
+        of the metrics and event logs, so all three can be joined on it. A frame's phases are laid out back to back from the start
+        of the frame. Events are formatted in chunks of frames and streamed to
+        the file rather than built up in memory.
+
+        Parameters
+        ----------
+        path : str
+            Output path for the json trace
+
+        Returns
+        -------
+        None
+
+        """
+        if not self.enabled:
+            return
+
+        template = (
+            '{{"name":{},"ph":"X","ts":{:.3f},"dur":{:.3f},"pid":0,"tid":0,'
+            '"args":{{"frame":{},"trial":{}}}}}'
+        )
+        names = [json.dumps(phase) for phase in self.PHASES]
+        n_phases = len(self.PHASES)
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            f.write('{"displayTimeUnit":"ms","traceEvents":[')
+            separator = ""
+            for start in range(0, self.n_frames, self.EXPORT_CHUNK_FRAMES):
+                stop = min(start + self.EXPORT_CHUNK_FRAMES, self.n_frames)
+                durations = self.durations[start:stop] * 1e6
+                offsets = np.cumsum(durations, axis=1) - durations
+                ts = self.frame_starts[start:stop, None] * 1e6 + offsets
+                frames = np.repeat(np.arange(start, stop), n_phases)
+                trials = np.repeat(self.frame_trials[start:stop], n_phases)
+
+                lines = map(
+                    template.format,
+                    names * (stop - start),
+                    ts.ravel().tolist(),
+                    durations.ravel().tolist(),
+                    frames.tolist(),
+                    trials.tolist(),
+                )
+                f.write(separator + ",\n".join(lines))
+                separator = ",\n"
+            f.write("]}")
+
+    def _grow(self):
+        capacity = max(1, 2 * len(self.frame_starts))
+        self.frame_starts = np.resize(self.frame_starts, capacity)
+        self.frame_trials = np.resize(self.frame_trials, capacity)
+        self.durations = np.resize(self.durations, (capacity, len(self.PHASES)))
@@ -3,70 +3,51 @@ import os
 import platform
 import datetime
 import time
-import configparser
 from collections import Counter
 
-# analysis
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-
 # non-standard library
 import readchar
 
 # local imports
-from reaction_time.utils import calculate_time_delta_ms, avg_time_scores_by
+from reaction_time.utils import calculate_time_delta_ms
+from reaction_time.config import load_session_plan
+from reaction_time.plotting import print_results
+from reaction_time.replay import save_event_log
+from reaction_time.trial_store import TrialStore
 
 
 class ReactionTime:
-    def __init__(self, config_path="config.cfg"):
+    def __init__(
+        self, config_path="config.cfg", profile=None, overrides=None, plan=None
+    ):
         """ Initialize the ReactionTime Object
 
         Parameters
         ----------
         config_path : str
             Path to the configuration file
+        profile : str, optional
+            Named profile within the configuration file to apply
+        overrides : dict, optional
+            (section, option) -> value overrides, e.g. from the command line
+        plan : SessionPlan, optional
+            Precompiled plan, skips loading config_path entirely
 
         """
-
-        # read the config file
-        print(
-            "Please provide the file path to your configuration file"
-            " (blank for default: ./config.cfg):\n"
-        )
-        user_config_path = input()
-        if user_config_path != "":
-            config_path = user_config_path
-
-        config = configparser.ConfigParser()
-        assert os.path.isfile(config_path), f"Config file not found at {config_path}"
-        print("Loading configuration.")
-        config.read(config_path)
+        if plan is None:
+            print("Loading configuration.")
+            plan = load_session_plan(config_path, profile=profile, overrides=overrides)
 
         print("Initializing ReactionTime.")
-        KEY_MAPPING = config.items("KEY_MAPPING")
-        KEY_SCORES = config.items("KEY_SCORES")
-
-        key_mapping_list, mapped_keys = zip(*KEY_MAPPING)
-        self.key_list, key_scores = zip(*KEY_SCORES)
-
-        self.plot_mode = config["MODE"]["PLOT_MODE"]
-        self.log_name = config["MODE"]["LOG_NAME"]
-
-        assert (
-            key_mapping_list == self.key_list
-        ), "KEY_MAPPING and KEY_SCORES don't have the same keys"
-
-        key_scores = np.array([int(score) for score in key_scores])
-        self.key_probabilities = key_scores / key_scores.sum()
-
-        low_speed = float(config["GENERAL"]["LOW_SPEED"])
-        high_speed = float(config["GENERAL"]["HIGH_SPEED"])
-        self.speed = lambda: np.random.uniform(low_speed, high_speed)
-
-        self.sequence_length = int(config["GENERAL"]["SEQUENCE_LENGTH"])
-        self.key_dict = {key: button for key, button in KEY_MAPPING}
+        self.plan = plan
+        self.key_list = plan.key_list
+        self.key_dict = plan.key_dict
+        self.key_probabilities = plan.key_probabilities
+        self.speed = plan.speed
+        self.sequence_length = plan.sequence_length
+        self.plot_mode = plan.plot_mode
+        self.log_name = plan.log_name
+        self.figures_dir = plan.figures_dir
 
         self.platform = platform.system()
 
@@ -86,10 +67,12 @@ class ReactionTime:
 
         """
         print("Running Reaction Time.\n\n")
-        history = list()
+        history = TrialStore(self.key_list)
+        events = list()
         count_history = Counter()
         previous_key = None
         n_iter = 0
+        session_start = datetime.datetime.now()
 
         print(f"Click one of the following: {self.key_dict.keys()}\n")
         print(
@@ -99,7 +82,7 @@ class ReactionTime:
 
         while True:
 
-            selected_key = np.random.choice(self.key_list, p=self.key_probabilities)
+            selected_key = self.plan.sample_key()
             print(selected_key)
 
             time_taken, user_key = self._read_user_input()
@@ -108,6 +91,10 @@ class ReactionTime:
             if correct_flag == -1:
                 break
 
+            # raw event stream for replay
+            press_ms = calculate_time_delta_ms(session_start, datetime.datetime.now())
+            events.append((n_iter, selected_key, user_key, press_ms, time_taken, 1))
+
             # track number of iterations since last selected
             iters_last_selected = self._update_count_history(
                 count_history, selected_key
@@ -116,7 +103,8 @@ class ReactionTime:
             # exclude first iteration (prevents skewing distribution)
             # previous key ~ prior iteration random key
             if n_iter != 0:
-                result = (
+                history.append(
+                    n_iter,
                     previous_key,
                     selected_key,
                     user_key,
@@ -124,112 +112,33 @@ class ReactionTime:
                     correct_flag,
                     iters_last_selected,
                 )
-                history.append(result)
 
             # update values for subsequent iterations
             previous_key = selected_key
             n_iter += 1
             time.sleep(self.speed())
 
+        save_event_log(events, f"logs/{self.log_name}_events.csv")
         metrics_df = self._create_save_metrics_df(history)
-        self.print_results(metrics_df)
+        self.print_results(metrics_df, output_dir=self.figures_dir)
 
     @staticmethod
-    def print_results(metrics_df):
+    def print_results(metrics_df, output_dir=None):
         """ Print average statistics and create plots to summarize the run
 
         Parameters
         ----------
         metrics_df: pd.DataFrame or str
             Output metrics from ReactionTime.run()
+        output_dir: str, optional
+            Save the figures here (drawn in parallel) instead of showing them
 
         Returns
         -------
         None
 
         """
-
-        # if string passed, read in dataframe
-        if isinstance(metrics_df, str):
-            metrics_df = pd.read_csv(metrics_df)
-
-        # print out some summary statistics
-        try:
-            key_performance = avg_time_scores_by(metrics_df, "key")
-            previous_key_performance = avg_time_scores_by(metrics_df, "previous_key")
-            transition_performance = avg_time_scores_by(
-                metrics_df, ["previous_key", "key"]
-            )
-        except pd.core.base.DataError:
-            raise ValueError("Not enough sample data to generate metrics.")
-
-        print(f"Average time for key\n: {key_performance}")
-        print(f"Average time given previous key\n: {previous_key_performance}")
-        print(f"Average time given transition\n: {transition_performance}")
-
-        fig, ax = plt.subplots(2, 1, sharex=True)
-        palette = {0: "#ff4500", 1: "#00ff00"}
-        sns.boxplot(data=metrics_df, x="key", y="time_ms", ax=ax[0])
-        sns.swarmplot(
-            data=metrics_df,
-            x="key",
-            y="time_ms",
-            hue="correct",
-            palette=palette,
-            alpha=0.5,
-            ax=ax[0],
-        )
-        ax[0].title.set_text("Time (ms) Distribution for Key")
-        ax[0].set_xlabel("")
-
-        sns.boxplot(data=metrics_df, x="previous_key", y="time_ms", ax=ax[1])
-        sns.swarmplot(
-            data=metrics_df,
-            x="previous_key",
-            y="time_ms",
-            hue="correct",
-            palette=palette,
-            alpha=0.5,
-            ax=ax[1],
-        )
-        ax[1].title.set_text("Time (ms) Distribution Given Previous Key")
-        ax[1].set_xlabel("")
-
-        # Set the formatting the same for both subplots
-        ax[0].tick_params(axis="both", which="both", labelsize=7, labelbottom=True)
-        ax[1].tick_params(axis="both", which="both", labelsize=7, labelbottom=True)
-
-        plt.tight_layout()
-        plt.show()
-
-        sns.scatterplot(
-            data=metrics_df,
-            x="time_ms",
-            y="iters_last_selected",
-            hue="correct",
-            palette=palette,
-            alpha=0.5,
-        )
-        plt.title("Time Taken vs Iterations Since Last Selected")
-        plt.show()
-
-        transition_matrix = pd.pivot_table(
-            data=transition_performance,
-            index="previous_key",
-            columns="key",
-            values="time_ms",
-        )
-        transition_count = pd.pivot_table(
-            data=metrics_df,
-            index="previous_key",
-            columns="key",
-            values="time_ms",
-            aggfunc="count",
-        )
-
-        sns.heatmap(data=transition_matrix, annot=transition_count, cmap="coolwarm")
-        plt.title("Transition Matrix (Color - Avg Time Taken (ms), Annotation - Count)")
-        plt.show()
+        print_results(metrics_df, output_dir=output_dir)
 
     def _update_count_history(self, count_history, selected_key):
 
@@ -281,16 +190,7 @@ class ReactionTime:
         return correct_flag
 
     def _create_save_metrics_df(self, history):
-        data_columns = [
-            "previous_key",
-            "key",
-            "user_key",
-            "time_ms",
-            "correct",
-            "iters_last_selected",
-        ]
-
-        metrics_df = pd.DataFrame(history, columns=data_columns)
+        metrics_df = history.to_dataframe()
         os.makedirs("logs", exist_ok=True)
         metrics_df.to_csv(f"logs/{self.log_name}.csv", index=False)
         return metrics_df
@@ -0,0 +1,136 @@
+# built-in
+import os
+from functools import partial
+from multiprocessing import Pool
+
+# analysis
+import numpy as np
+import pandas as pd
+
+EVENT_COLUMNS = ["trial", "key", "user_key", "press_ms", "time_ms", "hit"]
+
+
+def save_event_log(events, path):
+    """ Save the raw event stream of a session so it can be replayed later
+
+    Parameters
+    ----------
+    events: list
+        (trial, key, user_key, press_ms, time_ms, hit) tuples, one per key press
+    path: str
+        Output csv path
+
+    Returns
+    -------
+    pd.DataFrame
+        The saved event log
+
+    """
+    events_df = pd.DataFrame(events, columns=EVENT_COLUMNS)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    events_df.to_csv(path, index=False)
+    return events_df
+
+
+def replay_events(events_df, plan, require_hit=True):
+    """ Re-score a recorded event stream under the rules of a SessionPlan
+
+    The whole session is scored at once with vectorised pandas operations,
+    reproducing the columns written by ReactionTime.run():
+        - correct: user_key matches plan.key_dict[key] (and the circle was hit)
+        - iters_last_selected: trials since the key was last the stimulus
+        - time_ms: recorded time minus plan.calibration_ms (never below 0)
+
+    With CALIBRATION_MS = 0 and an unchanged KEY_MAPPING the result equals
+    the metrics log written by the live run.
+
+    Parameters
+    ----------
+    events_df: pd.DataFrame or str
+        Event log written by save_event_log (or its path)
+    plan: SessionPlan
+        Compiled configuration, e.g. from load_session_plan on an edited config
+    require_hit: bool, optional
+        Only count a press as correct if the mouse was inside the circle
+
+    Returns
+    -------
+    pd.DataFrame
+        Metrics in the same layout as the logs/ csv files
+
+    """
+
+    # if string passed, read in dataframe
+    if isinstance(events_df, str):
+        events_df = pd.read_csv(
+            events_df,
+            dtype={"key": str, "user_key": str},
+            keep_default_na=False,
+            na_values=[""],
+        )
+
+    # events are logged in press order
+    events_df = events_df.reset_index(drop=True)
+    keys = events_df["key"]
+
+    correct = keys.map(plan.key_dict) == events_df["user_key"].astype(str)
+    if require_hit:
+        correct &= events_df["hit"].astype(bool)
+
+    # position of the previous trial with the same key, first occurrence -> 0
+    position = pd.Series(np.arange(len(events_df)))
+    previous_position = position.groupby(keys.to_numpy()).shift()
+    iters_last_selected = (position - previous_position - 1).fillna(0).astype(int)
+
+    metrics_df = pd.DataFrame(
+        {
+            "trial": events_df["trial"],
+            "previous_key": keys.shift(),
+            "key": keys,
+            "user_key": events_df["user_key"],
+            "time_ms": (events_df["time_ms"] - plan.calibration_ms).clip(lower=0),
+            "correct": correct.astype(int),
+            "iters_last_selected": iters_last_selected,
+        }
+    )
+
+    # exclude first iteration (prevents skewing distribution), the GUI logs
+    # its first two presses as trial 0 and the live run drops both
+    return metrics_df[events_df["trial"] != 0].reset_index(drop=True)
+
+
+def replay_sessions(paths, plan, require_hit=True, processes=None):
+    """ Re-score many event logs in parallel worker processes
+
+    Parameters
+    ----------
+    paths: list
+        Paths to event logs written by save_event_log
+    plan: SessionPlan
+        Compiled configuration whose KEY_MAPPING and CALIBRATION_MS are applied
+    require_hit: bool, optional
+        Only count a press as correct if the mouse was inside the circle
+    processes: int, optional
+        Number of worker processes (default: os.cpu_count())
+
+    Returns
+    -------
+    pd.DataFrame
+        Concatenated metrics with an extra "session" column holding the path
+
+    """
+    replay = partial(_replay_file, plan=plan, require_hit=require_hit)
+
+    with Pool(processes) as pool:
+        sessions = pool.map(replay, paths)
+
+    if not sessions:
+        return pd.DataFrame()
+
+    return pd.concat(sessions, ignore_index=True)
+
+
+def _replay_file(path, plan, require_hit):
+    metrics_df = replay_events(path, plan, require_hit)
+    metrics_df["session"] = path
+    return metrics_df
@@ -0,0 +1,175 @@
+# analysis
+import numpy as np
+import pandas as pd
+
+MISSING_ID = np.iinfo(np.uint8).max
+MISSING_USER_ID = np.iinfo(np.uint32).max
+
+TRIAL_COLUMNS = [
+    "trial",
+    "previous_key",
+    "key",
+    "user_key",
+    "time_ms",
+    "correct",
+    "iters_last_selected",
+]
+
+
+class TrialStore:
+    """ Compact, growable columnar store for trial records
+
+    Keys are stored as uint8 ids (MISSING_ID for None) into key_list, user
+    keys as uint32 ids into a vocabulary built as new presses are seen (typed
+    sequences in terminal mode are unbounded, so they don't fit uint8), and the
+    numeric fields in narrow numpy dtypes. Columns are preallocated and grown
+    by doubling, so appending a trial never allocates python objects.
+
+    """
+
+    __slots__ = (
+        "key_list",
+        "key_ids",
+        "user_keys",
+        "user_key_ids",
+        "n_trials",
+        "trial",
+        "previous_key",
+        "key",
+        "user_key",
+        "time_ms",
+        "correct",
+        "iters_last_selected",
+    )
+
+    def __init__(self, key_list, capacity=1024):
+        """ Initialize the TrialStore Object
+
+        Parameters
+        ----------
+        key_list : sequence
+            Key names, a key's position is its id
+        capacity : int
+            Number of trials to preallocate
+
+        """
+        if len(key_list) >= MISSING_ID:
+            raise ValueError(f"At most {MISSING_ID} keys are supported")
+
+        self.key_list = list(key_list)
+        self.key_ids = {key: i for i, key in enumerate(self.key_list)}
+        self.user_keys = []
+        self.user_key_ids = {}
+        self.n_trials = 0
+
+        self.trial = np.zeros(capacity, dtype=np.uint32)
+        self.previous_key = np.full(capacity, MISSING_ID, dtype=np.uint8)
+        self.key = np.full(capacity, MISSING_ID, dtype=np.uint8)
+        self.user_key = np.full(capacity, MISSING_USER_ID, dtype=np.uint32)
+        self.time_ms = np.full(capacity, np.nan, dtype=np.float32)
+        self.correct = np.zeros(capacity, dtype=np.int8)
+        self.iters_last_selected = np.zeros(capacity, dtype=np.uint32)
+
+    def __len__(self):
+        return self.n_trials
+
+    @property
+    def nbytes(self):
+        """ Bytes used by the preallocated columns """
+        return sum(getattr(self, column).nbytes for column in TRIAL_COLUMNS)
+
+    def append(
+        self, trial, previous_key, key, user_key, time_ms, correct, iters_last_selected
+    ):
+        """ Append a single trial
+
+        Parameters
+        ----------
+        trial : int
+            Trial number (n_iter), shared with the event log and profiler trace
+        previous_key : str or None
+            Key of the prior iteration
+        key : str
+            Key that was selected
+        user_key : str or None
+            What the user pressed
+        time_ms : float or None
+            Time taken in milliseconds
+        correct : int
+            1 if correct, 0 otherwise
+        iters_last_selected : int
+            Iterations since key was last selected
+
+        Returns
+        -------
+        None
+
+        """
+        if self.n_trials == len(self.key):
+            self._grow()
+
+        i = self.n_trials
+        self.trial[i] = trial
+        self.previous_key[i] = self.key_ids.get(previous_key, MISSING_ID)
+        self.key[i] = self.key_ids.get(key, MISSING_ID)
+        self.user_key[i] = self._user_key_id(user_key)
+        self.time_ms[i] = np.nan if time_ms is None else time_ms
+        self.correct[i] = correct
+        self.iters_last_selected[i] = iters_last_selected or 0
+        self.n_trials += 1
+
+    def to_dataframe(self):
+        """ Convert the stored trials into a metrics DataFrame
+
+        Numeric columns are handed to pandas as views of the underlying arrays
+        and key columns become categoricals over their integer ids, so no per-row
+        python objects are created.
+
+        Returns
+        -------
+        pd.DataFrame
+            Columns TRIAL_COLUMNS, one row per trial
+
+        """
+        n = self.n_trials
+        return pd.DataFrame(
+            {
+                "trial": self.trial[:n],
+                "previous_key": self._categorical(
+                    self.previous_key[:n], self.key_list, MISSING_ID
+                ),
+                "key": self._categorical(self.key[:n], self.key_list, MISSING_ID),
+                "user_key": self._categorical(
+                    self.user_key[:n], self.user_keys, MISSING_USER_ID
+                ),
+                "time_ms": self.time_ms[:n],
+                "correct": self.correct[:n],
+                "iters_last_selected": self.iters_last_selected[:n],
+            },
+            copy=False,
+        )
+
+    def _user_key_id(self, user_key):
+        if user_key is None:
+            return MISSING_USER_ID
+
+        user_key_id = self.user_key_ids.get(user_key)
+        if user_key_id is None:
+            user_key_id = len(self.user_keys)
+            self.user_key_ids[user_key] = user_key_id
+            self.user_keys.append(user_key)
+        return user_key_id
+
+    @staticmethod
+    def _categorical(ids, categories, missing_id):
+        codes = ids.astype(np.int64)
+        codes[ids == missing_id] = -1
+        return pd.Categorical.from_codes(codes, categories=categories)
+
+    def _grow(self):
+        capacity = max(1, 2 * len(self.key))
+        for column in TRIAL_COLUMNS:
+            old = getattr(self, column)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, column, new)
@@ -49,7 +49,7 @@ def avg_time_scores_by(df, by, metrics=None, sort_by="time_ms"):
         metrics = ["time_ms", "correct"]
 
     return (
-        df.groupby(by)[metrics]
+        df.groupby(by, observed=True)[metrics]
         .mean()
         .sort_values(sort_by, ascending=False)
         .reset_index()
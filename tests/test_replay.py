@@ -0,0 +1,150 @@
+""" Replaying a recorded event log must reproduce the live metrics log """
+# built-in
+import io
+import itertools
+import os
+
+# analysis
+import numpy as np
+import pandas as pd
+import pytest
+
+# local imports
+import reaction_time.reaction_time_gui as reaction_time_gui
+from reaction_time.config import load_session_plan
+from reaction_time.reaction_time import ReactionTime
+from reaction_time.reaction_time_gui import ReactionTimeGUI
+from reaction_time.replay import replay_events
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "config.cfg")
+N_PRESSES = 200
+
+
+@pytest.fixture
+def plan(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return load_session_plan(
+        CONFIG_PATH,
+        overrides={("MODE", "LOG_NAME"): "session", ("MODE", "CALIBRATION_MS"): "0"},
+        cache_dir=None,
+    )
+
+
+def read_metrics(metrics):
+    if isinstance(metrics, pd.DataFrame):
+        buffer = io.StringIO()
+        metrics.to_csv(buffer, index=False)
+        buffer.seek(0)
+        metrics = buffer
+    return pd.read_csv(
+        metrics,
+        dtype={"previous_key": str, "key": str, "user_key": str},
+        keep_default_na=False,
+        na_values=[""],
+    )
+
+
+def assert_replay_matches_live(plan):
+    live = read_metrics(f"logs/{plan.log_name}.csv")
+    replayed = read_metrics(replay_events(f"logs/{plan.log_name}_events.csv", plan))
+
+    assert len(live) > 0
+    pd.testing.assert_frame_equal(replayed, live, check_dtype=False)
+
+
+def test_replay_matches_terminal_run(plan, monkeypatch):
+    rng = np.random.RandomState(0)
+    np.random.seed(0)
+    buttons = [button for _, button in plan.key_mapping] + ["z", "9"]
+    presses = [
+        (float(rng.randint(150, 900)), buttons[rng.randint(len(buttons))])
+        for _ in range(N_PRESSES)
+    ]
+    presses = iter(presses + [(0.0, "x")])
+
+    reaction = ReactionTime(plan=plan)
+    reaction._read_user_input = lambda: next(presses)
+    reaction.print_results = lambda *args, **kwargs: None
+    monkeypatch.setattr("reaction_time.reaction_time.time.sleep", lambda _: None)
+
+    reaction.run()
+
+    assert_replay_matches_live(plan)
+
+
+class FakeGame:
+    """ Stands in for GameConfig, pressing scripted keys on some frames """
+
+    display_height = 600
+
+    def __init__(self, presses):
+        self.presses = presses
+        self.run = True
+        self.n_iter = 0
+        self.score = 0
+        self.start_time = None
+        self.ticks = 0
+        self.clock = self
+
+    def event_handler(self, circle, selected_key):
+        self.ticks += 17
+        press = next(self.presses)
+        if press is None:
+            return None, None, None, None
+        if press == "quit":
+            self.run = False
+            return None, None, None, None
+
+        user_key, hit = press
+        circle.fade = True
+        time_elapsed = self.ticks - self.start_time if self.start_time else None
+        correct_flag = int(hit and user_key == selected_key)
+        self.score += correct_flag
+        self.start_time = self.ticks
+        return time_elapsed, user_key, correct_flag, hit
+
+    def fill_background(self):
+        pass
+
+    def print_score(self):
+        pass
+
+    def tick(self, fps):
+        pass
+
+    def quit(self):
+        pass
+
+
+class FakeCircle:
+    """ Stands in for Circle, fading out once it has been pressed """
+
+    def __init__(self, game, key, radius):
+        self.alpha = 255
+        self.fade = False
+
+    def render_self_with_text(self, text):
+        if self.fade:
+            self.alpha = max(0, self.alpha - 15)
+
+
+def test_replay_matches_gui_run(plan, monkeypatch):
+    rng = np.random.RandomState(1)
+    np.random.seed(1)
+    buttons = [button for _, button in plan.key_mapping] + ["", "z"]
+    frames = []
+    for _ in range(N_PRESSES):
+        frames.extend([None] * rng.randint(0, 5))
+        frames.append((buttons[rng.randint(len(buttons))], int(rng.rand() < 0.9)))
+    frames = itertools.chain(frames, ["quit"])
+
+    monkeypatch.setattr(reaction_time_gui, "GameConfig", lambda: FakeGame(frames))
+    monkeypatch.setattr(reaction_time_gui, "Circle", FakeCircle)
+    monkeypatch.setattr(reaction_time_gui.pygame.display, "update", lambda: None)
+
+    reaction = ReactionTimeGUI(plan=plan)
+    reaction.print_results = lambda *args, **kwargs: None
+
+    reaction.run()
+
+    assert_replay_matches_live(plan)